@@ -6,12 +6,15 @@ __version__ = '0.1.3'
 __all__ = [#"Events", "Asset", "Assets", "Contract", "Collection",
            #"CollectionStats", "Collections", "Bundles", 
            "utils",
-           "NftScanAPI"]
+           "NftScanAPI",
+           "AsyncNftScanAPI",
+           "AuthenticationError"]
 
 # from nftscan.nftscan import Events, Asset, Assets, Contract, Collection, \
 #     CollectionStats, Collections, Bundles
 # from nftscan.nftscan_api import NftScanAPI
 # from nftscan import utils
 
-from .nftscan_api import NftScanAPI
+from .nftscan_api import AuthenticationError, NftScanAPI
+from .nftscan_async import AsyncNftScanAPI
 from . import utils
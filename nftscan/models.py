@@ -0,0 +1,38 @@
+"""Typed containers the API responses can be decoded into, instead of dicts.
+
+Requires the `typed` extra: `pip install nftscan-api[typed]`
+"""
+from typing import Any, Generic, Optional, TypeVar
+import msgspec
+
+T = TypeVar("T")
+
+
+class Envelope(msgspec.Struct, Generic[T], gc=False):
+    """Wrapper the API puts around the data of every response."""
+    code: int
+    # Left out of some error responses
+    data: Optional[T] = None
+    msg: Optional[str] = None
+
+
+class Page(msgspec.Struct, Generic[T], gc=False):
+    """One page of records of a paginated endpoint."""
+    total: int = 0
+    content: list[T] = []
+
+
+def envelope_decoder(paginated, record_type=Any):
+    """Builds the decoder for the responses of an endpoint.
+
+    Args:
+        paginated (bool): whether the endpoint returns a `Page`
+        record_type (type, optional): type to decode the records (or the
+        data, for endpoints that aren't paginated) into, eg. a
+        `msgspec.Struct` subclass. By default they're decoded into dicts.
+
+    Returns:
+        msgspec.json.Decoder
+    """
+    data_type = Page[record_type] if paginated else record_type
+    return msgspec.json.Decoder(Envelope[data_type])
@@ -1,40 +1,141 @@
-import json
+import brotli  # noqa: F401 -- lets requests and httpx decode "br" responses
+import copy
+import logging
+import math
+import orjson
 import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from numbers import Number
-from parameters_validation import validate_parameters, parameter_validation, non_blank, non_negative
 # from nftscan import utils
 from . import utils
 
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+ACCEPT_ENCODING = "br, gzip, deflate"
 
 
 # Validators
-@parameter_validation
+# Plain functions called at the top of each endpoint method: cheaper than
+# re-inspecting signatures on every call with a validation decorator.
 def erc_valid(erc: str):
     if erc not in ["erc721", "erc1155"]:
         raise ValueError("erc must be one of \"erc721\" or \"erc1155\"")
 
-@parameter_validation
-def more_than_zero(number: Number,  arg_name: str):
-    validation_error = None
-    try:
-        if number <= 0:
-            validation_error = ValueError(
-                "Parameter `{arg}` must be 1 or higher".format(arg=arg_name))
-    except Exception as e:
-        validation_error = RuntimeError(
-            "Unable to validate parameter `{arg}`: {error_name}{error}".format(arg=arg_names, error_name=e.__class__.__name__, error=e), e)
-    if validation_error:
-        raise 
+def non_blank(value: str, arg_name: str):
+    if not value or not value.strip():
+        raise ValueError("Parameter `{arg}` cannot be blank".format(arg=arg_name))
+
+def non_negative(number: Number, arg_name: str):
+    if number < 0:
+        raise ValueError(
+            "Parameter `{arg}` must be 0 or higher".format(arg=arg_name))
+
+def more_than_zero(number: Number, arg_name: str):
+    if number is None or number <= 0:
+        raise ValueError(
+            "Parameter `{arg}` must be 1 or higher".format(arg=arg_name))
+
+class AuthenticationError(requests.exceptions.HTTPError):
+    """The API rejected the access token (401)."""
+
+def _raise_for_status_code(status_code, text, response=None):
+    """Raises the exception matching an error status code, either the HTTP
+    one or the one the API embeds in its JSON responses.
+
+    Args:
+        status_code (int): status code to check
+        text (str): error message, usually the body of the response
+        response (optional): response the status code belongs to
+    """
+    if status_code == 400:
+        raise ValueError(text)
+    elif status_code == 401:
+        raise AuthenticationError(text, response=response)
+    elif status_code == 403:
+        # TODO: auth exception?
+        raise ConnectionError("The server blocked access.")
+    elif status_code == 495:
+        raise requests.exceptions.SSLError("SSL certificate error")
+    elif status_code == 504:
+        raise TimeoutError("The server reported a gateway time-out error.")
+    elif status_code >= 400:
+        raise requests.exceptions.HTTPError(
+            f"{status_code} Error: {text}", response=response)
+
+def _check_code_events(events):
+    """Passes ijson parsing events through, failing as soon as the status
+    code embedded in the JSON response turns out not to be a success."""
+    for prefix, event, value in events:
+        if prefix == "code":
+            _raise_for_status_code(value, f"Request failed with code {value}")
+        yield prefix, event, value
+
+def _page_total(page):
+    """`total` of a page of records, either a dict or a typed `Page`."""
+    return page["total"] if isinstance(page, dict) else page.total
+
+def _page_content(page):
+    """`content` of a page of records, either a dict or a typed `Page`."""
+    return page["content"] if isinstance(page, dict) else page.content
+
+def _encode_json(data):
+    """Serializes a request body, leaving the body empty when there's no
+    data to send."""
+    if data is None:
+        return None
+    return orjson.dumps(data)
 
 class NftScanAPI:
+    # Fixed set of attributes: smaller instances, faster attribute access
+    __slots__ = (
+        "api_url",
+        "apiKey",
+        "apiSecret",
+        "accessToken",
+        "expiration",
+        "headers",
+        "token_cache_file",
+        "_auth_lock",
+        "_auth_url",
+        "_cache",
+        "_decoders",
+        "_rate_limiter",
+        "_session",
+        "_urls",
+    )
     MAX_PAGE_SIZE = 100
-    @validate_parameters
+    # (connect, read) timeouts, in seconds
+    TIMEOUT = (5, 30)
+    # Token endpoint, relative to `base_url`
+    AUTH_PATH = "../gw/token"
+    # Access tokens are refreshed this long before they actually expire
+    TOKEN_REFRESH_MARGIN = timedelta(seconds=30)
+    # Statuses telling the request was rate limited, and how many times
+    # such requests are retried
+    RATE_LIMITED_STATUSES = (429, 503)
+    MAX_RETRIES = 5
     def __init__(self, 
-                apiKey: non_blank(str),
-                apiSecret: non_blank(str),
+                apiKey: str,
+                apiSecret: str,
                 base_url="https://restapi.nftscan.com/api/",
-                version="v1"):
+                version="v1",
+                token_cache_file=None,
+                cache_ttl=300,
+                cache_size=10_000,
+                rate_limit=None,
+                typed=False,
+                record_types=None):
         """Base class to interact with the NftScan API and fetch NFT data.
 
         Args:
@@ -42,13 +143,91 @@ class NftScanAPI:
         "https://restapi.nftscan.com/api/".
         apikey (str): NftScan API key (you need to request one)
         version (str, optional): API version. Defaults to "v1".
+        token_cache_file (str, optional): File to persist the access token
+        in, so it can be reused across processes until it expires, eg.
+        "~/.cache/nftscan/token.json". By default, tokens are only kept in
+        memory.
+        cache_ttl (int, optional): Seconds for which the results of lookups
+        that rarely change (eg. `getSingleNft`) are cached and reused.
+        Defaults to 300, set it to 0 to disable caching.
+        cache_size (int, optional): Maximum number of cached results.
+        rate_limit (float, optional): Maximum number of requests per second.
+        By default (or when 0), requests are only held back once the server reports the
+        rate limit was reached.
+        typed (bool, optional): Decode responses into `msgspec` structs (see
+        `nftscan.models`) instead of dicts: paginated endpoints return a
+        `Page` with `total` and `content` attributes. Requires the `typed`
+        extra.
+        record_types (dict, optional): Maps endpoint names to the
+        `msgspec.Struct` type their records (or data, when not paginated)
+        are decoded into, implies `typed`. Records are dicts by default.
         """
-        self.api_url = f"{base_url}/{version}"
+        non_blank(apiKey, "apiKey")
+        non_blank(apiSecret, "apiSecret")
+        self.api_url = f"{base_url.rstrip('/')}/{version}"
+        # Endpoint urls never change, so they're only built once
+        self._urls = {endpoint: f"{self.api_url}/{endpoint}" for endpoint in _ENDPOINTS}
+        # Same origin as the API, so token refreshes reuse its connections
+        self._auth_url = urljoin(f"{base_url.rstrip('/')}/", self.AUTH_PATH)
         #key and secret are forced to stay in memory!!
         self.apiKey = apiKey
         self.apiSecret = apiSecret
         self.accessToken = None
-        self.headers = {"Content-Type": "application/json"}
+        self.expiration = None
+        self._auth_lock = self._create_auth_lock()
+        self.headers = {
+            "Content-Type": "application/json",
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
+        self._session = self._create_session()
+        self.token_cache_file = token_cache_file
+        if token_cache_file:
+            self._load_token()
+        self._cache = utils.TTLCache(cache_size, cache_ttl) if cache_ttl else None
+        if rate_limit is not None and rate_limit < 0:
+            raise ValueError("Parameter `rate_limit` cannot be negative")
+        self._rate_limiter = utils.TokenBucket(
+            rate_limit, burst=max(1, int(rate_limit or 1)))
+        self._decoders = None
+        if typed or record_types:
+            self._decoders = _create_decoders(record_types or {})
+
+    def _create_session(self):
+        """Creates the pooled, keep-alive HTTP session shared by every
+        request made through this instance.
+
+        Returns:
+            requests.Session
+        """
+        # All endpoints are lookups, so it is safe to retry the POSTs too.
+        # Rate limited responses are retried by _make_request instead.
+        retries = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 504],
+            allowed_methods=frozenset(["GET", "POST"]),
+            # Hand the last response over to _handle_response, so it raises
+            # the usual exceptions (eg. TimeoutError on 504) not RetryError
+            raise_on_status=False)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=retries)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def close(self):
+        """Closes the underlying HTTP session and its pooled connections."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     def _authenticate(self):
         """Base class to authenticate against the NftScan API and fetch NFT data.
@@ -59,33 +238,105 @@ class NftScanAPI:
 
         Args:
         """
-        auth_url=f"https://restapi.nftscan.com/gw/token?apiKey={self.apiKey}&apiSecret={self.apiSecret}"
-        result = self._make_request(auth_url)
+        result = self._make_request(
+            self._auth_url, params=self._auth_params(), method="GET")
         
         # Note: authentication API uses entirely different error/exception
         # pattern from the rest of the API. So we're forced to check the _content_
         # of the response for a status code as well:
 
-        self.accessToken = result["accessToken"]
-        self.expiration = datetime.now() + timedelta(seconds=result["expiration"])
-        self.headers["Access-Token"]=self.accessToken
+        self._store_token(result)
+
+    def _auth_params(self):
+        """Query parameters of the authentication request."""
+        return {"apiKey": self.apiKey, "apiSecret": self.apiSecret}
+
+    def _token_expired(self):
+        """Whether a new access token is needed before making a request."""
+        return (self.accessToken is None
+                or datetime.now() >= self.expiration - self.TOKEN_REFRESH_MARGIN)
+
+    def _create_auth_lock(self):
+        """Lock making sure concurrent requests authenticate only once."""
+        return threading.Lock()
+
+    def _ensure_token(self):
+        """Authenticates, unless the current access token is still valid."""
+        if self._token_expired():
+            with self._auth_lock:
+                # Another thread may have authenticated in the meantime
+                if self._token_expired():
+                    self._authenticate()
+
+    def _refresh_token(self, rejected_token):
+        """Authenticates again after the API rejected an access token.
+
+        Args:
+            rejected_token (str): the token that was rejected; when another
+            thread already replaced it, that new token is used instead
+        """
+        with self._auth_lock:
+            if self.accessToken == rejected_token:
+                self._authenticate()
+
+    def _store_token(self, result):
+        """Keeps the access token returned by the authentication endpoint.
+
+        Args:
+            result (dict): `data` section of the authentication response
+        """
+        self._set_token(
+            result["accessToken"],
+            datetime.now() + timedelta(seconds=result["expiration"]))
+        if self.token_cache_file:
+            utils.export_private_json({
+                    "apiKey": self.apiKey,
+                    "accessToken": self.accessToken,
+                    "expiration": self.expiration.timestamp(),
+                },
+                self.token_cache_file)
+
+    def _load_token(self):
+        """Reuses the access token persisted in `token_cache_file`, if it
+        belongs to this API key and hasn't expired yet."""
+        cached = utils.import_json(self.token_cache_file)
+        if (not isinstance(cached, dict) or cached.get("apiKey") != self.apiKey
+                or "accessToken" not in cached or "expiration" not in cached):
+            return
+        self._set_token(
+            cached["accessToken"],
+            datetime.fromtimestamp(cached["expiration"]))
+        if self._token_expired():
+            self.accessToken = None
+
+    def _set_token(self, access_token, expiration):
+        self.accessToken = access_token
+        self.expiration = expiration
+        # Sent along with every request made through the session from now on
+        self._session.headers["Access-Token"]=self.accessToken
 
 
-    @validate_parameters
     def _make_request(self, 
-        url: non_blank(str), 
+        url: str, 
         headers=None, 
         data=None,
         export_file_name="",
-        return_response=False):
+        return_response=False,
+        params=None,
+        method="POST",
+        decoder=None):
         """Makes a request to an arbitrary url and returns either a response
         object or dictionary.
 
+        Requests are paced by the rate limiter, and requests that get rate
+        limited by the server (429/503) are retried with an exponential
+        back-off, honouring the `Retry-After` header when there is one.
+
         Args:
             url (str): url to make a request to
-            headers (dict, optional): headers to attach to the request
-            params (dict, optional): Query parameters to include in the
-            request. Defaults to None.
+            headers (dict, optional): headers to attach to the request, on
+            top of the session's ones
+            data (dict, optional): JSON body of the request
             export_file_name (str, optional): In case you want to download the
             data into a file,
             specify the filename here. Eg. 'export.json'. Be default, no file
@@ -96,62 +347,117 @@ class NftScanAPI:
             next_url (str, optional): If you want to paginate, provide the
             `next` value here (this is a URL) NftScan provides in the response.
             If this argument is provided, `endpoint` will be ignored.
+            params (dict, optional): Query parameters to include in the
+            request. Defaults to None.
+            method (str, optional): HTTP method. Defaults to "POST".
+            decoder (msgspec.json.Decoder, optional): Decoder for a typed
+            response. By default, the response is decoded into dicts.
+
+
+        Returns:
+            Data sent back from the API. Either a response or dict object
+            depending on the `return_response` argument.
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._throttle()
+            response = self._session.request(
+                method,
+                url,
+                params=params,
+                data=_encode_json(data),
+                headers=headers,
+                timeout=self.TIMEOUT)
+            if not self._should_retry(response, attempt):
+                break
+            time.sleep(utils.backoff_delay(response.headers, attempt))
+        return self._handle_response(
+            response, export_file_name, return_response, decoder)
+
+    def _throttle(self):
+        """Waits until the rate limiter lets another request through."""
+        delay = self._rate_limiter.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _should_retry(self, response, attempt):
+        """Feeds the rate limit state reported by a response to the rate
+        limiter, and tells whether the request was rate limited and can be
+        retried.
+
+        Args:
+            response: response returned by the HTTP client
+            attempt (int): number of attempts made so far, starting at 0
+        """
+        self._rate_limiter.update(*utils.rate_limit_from_headers(response.headers))
+        return (response.status_code in self.RATE_LIMITED_STATUSES
+                and attempt < self.MAX_RETRIES)
+
+    def _handle_response(self, response, export_file_name="", return_response=False,
+                         decoder=None):
+        """Checks a response for errors and extracts its data.
 
+        Shared by the sync and async clients; `response` can be either a
+        `requests` or an `httpx` response object.
+
+        Args:
+            response: response returned by the HTTP client
+            export_file_name (str, optional): file to export the data into
+            return_response (bool, optional): return the response object
+            instead of the data
+            decoder (msgspec.json.Decoder, optional): decoder for a typed
+            response
 
         Returns:
             Data sent back from the API. Either a response or dict object
             depending on the `return_response` argument.
         """
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        if response.status_code == 400:
-            raise ValueError(response.text)
-        elif response.status_code == 401:
-            raise requests.exceptions.HTTPError(response.text)
-        elif response.status_code == 403:
-            # TODO: auth exception?
-            raise ConnectionError("The server blocked access.")
-        elif response.status_code == 495:
-            raise requests.exceptions.SSLError("SSL certificate error")
-        elif response.status_code == 504:
-            raise TimeoutError("The server reported a gateway time-out error.")
+        # Fail on HTTP errors before touching the body, which for these is
+        # often not even JSON
+        if response.status_code >= 400:
+            _raise_for_status_code(response.status_code, response.text, response)
+        if "Content-Encoding" not in response.headers:
+            # Leave the query string out, it carries the credentials when
+            # authenticating
+            logger.debug(
+                "Uncompressed response (%d bytes) from %s",
+                len(response.content), str(response.url).split("?")[0])
 
         # It appears the API implementation includes a separate JSON field called status
         # which ...... _also_ encodes a HTTP response status. So we check again...
 
-        json_response = response.json()
-        if not "code" in json_response.keys():
-            raise Exception("Request failed, no HTTP status code in JSON response")
-        status_code = json_response["code"]
-        if not "data" in json_response.keys():
-            raise Exception("Request failed, no data in JSON response")
-        
-        data = json_response["data"]
-
-        if status_code == 400:
-            raise ValueError(response.text)
-        elif status_code == 401:
-            raise requests.exceptions.HTTPError(response.text)
-        elif status_code == 403:
-            # TODO: auth exception?
-            raise ConnectionError("The server blocked access.")
-        elif status_code == 495:
-            raise requests.exceptions.SSLError("SSL certificate error")
-        elif status_code == 504:
-            raise TimeoutError("The server reported a gateway time-out error.")
+        if decoder is not None:
+            # Required fields are enforced by the decoder; `data` may be
+            # missing from error responses
+            envelope = decoder.decode(response.content)
+            status_code, data = envelope.code, envelope.data
+        else:
+            json_response = orjson.loads(response.content)
+            if "code" not in json_response:
+                raise Exception("Request failed, no HTTP status code in JSON response")
+            status_code = json_response["code"]
+            # Error responses may come without data: their code is checked below
+            if status_code < 400 and "data" not in json_response:
+                raise Exception("Request failed, no data in JSON response")
+            data = json_response.get("data")
+        if status_code >= 400:
+            # Only decode the body into text for the error message
+            _raise_for_status_code(status_code, response.text, response)
 
         if export_file_name != "":
-            utils.export_file(utils.force_encoded_json(data), export_file_name)
+            # Write the body as received rather than re-serializing `data`
+            utils.export_file(response.content, export_file_name)
         if return_response:
             return response
         return data 
 
 
-    @validate_parameters
     def _api_request(self, 
-        endpoint: non_blank(str), 
+        endpoint: str, 
         data=None, 
         export_file_name="",
-        return_response=False):
+        return_response=False,
+        stream=False,
+        cache=False):
         """Makes an authenticated request to the NftScan API and 
         returns either a response object or dictionary.
         
@@ -170,383 +476,392 @@ class NftScanAPI:
             next_url (str, optional): If you want to paginate, provide the
             `next` value here (this is a URL) NftScan provides in the response.
             If this argument is provided, `endpoint` will be ignored.
+            stream (bool, optional): Set it True to get a generator lazily
+            decoding the records in `data.content` while they're downloaded.
+            Can't be combined with `export_file_name` or `return_response`.
+            cache (bool, optional): Set it True to reuse the data of an
+            identical request made less than `cache_ttl` seconds ago. Only
+            applies when neither a file nor the response object is requested.
 
 
         Returns:
             Data sent back from the API. Either a response or dict object
             depending on the `return_response` argument.
         """
-        url = f"{self.api_url}/{endpoint}"
+        url = self._endpoint_url(endpoint)
         result = None
+        cache_key = self._cache_key(endpoint, data, cache and not (
+            export_file_name or return_response or stream))
+        if cache_key is not None:
+            result = self._cached_result(cache_key)
+            if result is not None:
+                return result
+        if stream:
+            if export_file_name != "" or return_response:
+                raise ValueError(
+                    "stream can't be combined with export_file_name or return_response")
+            return self._stream_request(url, data)
+        self._ensure_token()
+        decoder = self._decoders.get(endpoint) if self._decoders else None
+        token = self.accessToken
         try:
             result = self._make_request(
                 url,
-                headers=self.headers,
                 data=data,
                 export_file_name=export_file_name,
-                return_response=return_response
+                return_response=return_response,
+                decoder=decoder
             )
-        except Exception as e:
-            # TODO: only auth+retry if auth exception 
-            self._authenticate()
+        except AuthenticationError:
+            # The token was rejected (eg. revoked early): get a new one and retry
+            self._refresh_token(token)
             result = self._make_request(
                 url,
-                headers=self.headers,
                 data=data,
                 export_file_name=export_file_name,
-                return_response=return_response
+                return_response=return_response,
+                decoder=decoder
             )
         
+        if cache_key is not None:
+            self._cache_result(cache_key, result)
         return result
 
+    def _endpoint_url(self, endpoint):
+        """Full url of an API endpoint."""
+        url = self._urls.get(endpoint)
+        if url is None:
+            url = f"{self.api_url}/{endpoint}"
+        return url
+
+    def _cache_key(self, endpoint, data, cache=True):
+        """Key identifying a request in the results cache.
+
+        Returns:
+            The key, or None if the request shouldn't be cached.
+        """
+        if not cache or self._cache is None:
+            return None
+        return endpoint, orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+    def _cache_result(self, cache_key, result):
+        """Stores the data of a response in the results cache.
 
-    @validate_parameters
-    def getAllNftByUserAddress(
-            self,
-            erc: erc_valid(str),
-            user_address: str,
-            page_index: more_than_zero(int)=1,
-            page_size: int=20,
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            see # https://developer.nftscan.com/doc/#operation/getAllNftByUserAddressUsingPOST
-
-            Args:
-                erc (str): erc protocol (erc721 or erc1155)
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getAllNftByUserAddress"
-            query_params = {
-                "erc": erc,
-                "page_index": page_index,
-                "page_size": min(page_size, self.MAX_PAGE_SIZE), # TODO: validator?
-                "user_address": user_address
-            }
-            return self._api_request(endpoint, query_params, export_file_name)
-
-
-    @validate_parameters
-    def getGroupByNftContract(
-            self,
-            erc: erc_valid(str),
-            user_address: str,
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getGroupByNftContractUsingPOST
-
-            Args:
-                erc (str): erc protocol (erc721 or erc1155)
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getGroupByNftContract"
-            data = {
-                "erc": erc,
-                "user_address": user_address
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getMintByUserAddress(
-            self,
-            page_index: more_than_zero(int)=1,
-            page_size: non_negative(int)=20,
-            user_address: non_blank(str)="",
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getMintByUserAddressUsingPOST
-
-            Args:
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getMintByUserAddress"
-            data = {
-                "page_index": page_index,
-                "page_size": page_size,
-                "user_address": user_address
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getMintByUserAddressAndNftAddress(
-            self,
-            nft_address: non_blank(str)="",
-            page_index: more_than_zero(int)=1,
-            page_size: non_negative(int)=20,
-            user_address: non_blank(str)="",
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getMintByUserAddressAndNftAddressUsingPOST
-
-            Args:
-                nft_address (str): NFT contract address
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getMintByUserAddressAndNftAddress"
-            data = {
-                "nft_address": nft_address,
-                "page_index": page_index,
-                "page_size": page_size,
-                "user_address": user_address
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getNFTRecordByContract(
-            self,
-            nft_address: non_blank(str)="",
-            page_index: more_than_zero(int)=1,
-            page_size: non_negative(int)=20,
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getNFTRecordByContractUsingPOST
-
-            Args:
-                nft_address (str): NFT contract address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getNFTRecordByContract"
-            data = {
-                "nft_address": nft_address,
-                "page_index": page_index,
-                "page_size": page_size,
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getNftByContractAndUserAddress(
-            self,
-            nft_address: non_blank(str)="",
-            page_index: more_than_zero(int)=1,
-            page_size: non_negative(int)=20,
-            user_address: non_blank(str)="",
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getNftByContractAndUserAddressUsingPOST
-
-            Args:
-                nft_address (str): NFT contract address
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getNftByContractAndUserAddress"
-            data = {
-                "nft_address": nft_address,
-                "page_index": page_index,
-                "page_size": page_size,
-                "user_address": user_address
-            }
-            return self._api_request(endpoint, data, export_file_name)
-    
-
-    @validate_parameters
-    def getRecordByUserAddressAndTokenId(
-            self,
-            nft_address: non_blank(str)="",
-            page_index: more_than_zero(int)=1,
-            page_size: non_negative(int)=20,
-            token_id: non_blank(str)="",
-            user_address: non_blank(str)="",
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getRecordByUserAddressAndTokenIdUsingPOST
-
-            Args:
-                nft_address (str): NFT contract address
-                token_id (str): Token id
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getRecordByUserAddressAndTokenId"
-            data = {
-                "nft_address": nft_address,
-                "page_index": page_index,
-                "page_size": page_size,
-                "token_id":token_id,
-                "user_address": user_address
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getSingleNft(
-            self,
-            nft_address: non_blank(str)="",
-            token_id: non_blank(str)="",
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getSingleNftUsingPOST
-
-            Args:
-                nft_address (str): NFT contract address
-                token_id (str): Token id
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getSingleNft"
-            data = {
-                "nft_address": nft_address,
-                "token_id":token_id
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getSingleNftRecord(
-            self,
-            nft_address: non_blank(str)="",
-            page_index: more_than_zero(int)=1,
-            page_size: non_negative(int)=20,
-            token_id: non_blank(str)="",
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getSingleNftRecordUsingPOST
-
-            Args:
-                nft_address (str): NFT contract address
-                token_id (str): Token id
-                user_address (str): User address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getSingleNftRecord"
-            data = {
-                "nft_address": nft_address,
-                "page_index": page_index,
-                "page_size": page_size,
-                "token_id":token_id
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getStates(
-            self,
-            nft_address: None,
-            export_file_name: str="",
-        ):
-            """Fetches Nft data from the API. 
-            https://developer.nftscan.com/doc/#operation/getStatesUsingPOST
-
-            Args:
-                nft_address [(str)]: array of NFT contract address
-                export_file_name (str, optional): Exports the JSON data into a the
-                specified file.
-
-            Returns:
-                [dict]: All Nfts for given protocol and users
-            """
-            endpoint = f"getStates"
-            data = {
-                "nft_address": nft_address,
-            }
-            return self._api_request(endpoint, data, export_file_name)
-
-
-    @validate_parameters
-    def getUserRecordByContract(
-        self,
-        nft_address: non_blank(str)="",
-        page_index: more_than_zero(int)=1,
-        page_size: non_negative(int)=20,
-        user_address: non_blank(str)="",
-        export_file_name: str="",
-    ):
-        """Fetches Nft data from the API. 
-        https://developer.nftscan.com/doc/#operation/getUserRecordByContractUsingPOST
+        Plain data is stored as JSON bytes, so that every cache hit decodes
+        its own copy instead of sharing one mutable object between callers.
+        Typed data is copied, as the caller keeps the original.
+        """
+        if self._decoders is None:
+            result = orjson.dumps(result)
+        else:
+            result = copy.deepcopy(result)
+        self._cache.set(cache_key, result)
+
+    def _cached_result(self, cache_key):
+        """Copy of the data stored under `cache_key`, or None if missing."""
+        result = self._cache.get(cache_key)
+        if result is None:
+            return None
+        if self._decoders is None:
+            return orjson.loads(result)
+        return copy.deepcopy(result)
+
+    def _stream_request(self, url, data=None):
+        """Makes a request and lazily decodes the records listed in the
+        `data.content` array of the response, as the body is downloaded.
+
+        Only one record at a time is held in memory, rather than the whole
+        response.
 
         Args:
-            nft_address (str): NFT contract address
-            user_address (str): User address
-            export_file_name (str, optional): Exports the JSON data into a the
-            specified file.
+            url (str): url to make a request to
+            data (dict, optional): request body
 
-        Returns:
-            [dict]: All Nfts for given protocol and users
+        Yields:
+            dict: records in `data.content`
         """
-        endpoint = f"getUserRecordByContract"
-        data = {
-            "nft_address": nft_address,
-            "page_index": page_index,
-            "page_size": page_size,
-            "user_address":user_address
-        }
-        return self._api_request(endpoint, data, export_file_name)
+        if ijson is None:
+            raise ImportError(
+                "Streaming responses requires ijson: pip install nftscan-api[stream]")
+        # Checked here rather than by _api_request: the request is only made
+        # once the generator is first iterated
+        self._ensure_token()
+        for attempt in range(2):
+            token = self.accessToken
+            yielded = False
+            try:
+                with self._open_stream(url, data) as response:
+                    # Let urllib3 undo any gzip/deflate content encoding
+                    response.raw.decode_content = True
+                    events = _check_code_events(ijson.parse(response.raw))
+                    for record in ijson.items(events, "data.content.item"):
+                        yielded = True
+                        yield record
+                return
+            except AuthenticationError:
+                # Records already handed out can't be taken back: only retry
+                # when the token was rejected before the first one
+                if yielded or attempt:
+                    raise
+                self._refresh_token(token)
+
+    def _open_stream(self, url, data=None):
+        """Makes a streamed request, retrying it while rate limited like
+        `_make_request` does, and fails on HTTP errors.
 
+        Returns:
+            requests.Response: response whose body hasn't been read yet
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            self._throttle()
+            response = self._session.post(
+                url,
+                data=_encode_json(data),
+                timeout=self.TIMEOUT,
+                stream=True)
+            if not self._should_retry(response, attempt):
+                break
+            response.close()
+            time.sleep(utils.backoff_delay(response.headers, attempt))
+        if response.status_code >= 400:
+            # Only read the body of error responses, the rest is streamed
+            with response:
+                _raise_for_status_code(response.status_code, response.text, response)
+        return response
+
+    def iter_all_pages(self, method_name, page_size=MAX_PAGE_SIZE, max_workers=16, **kwargs):
+        """Iterates over the records of every page of a paginated endpoint.
+
+        The first page is fetched to learn the `total` number of records, then
+        the remaining pages are fetched in parallel over the shared session.
+        Records are yielded as soon as their page arrives, so pages after the
+        first aren't necessarily yielded in order.
 
-    @validate_parameters
-    def getUserRecordByUserAddress(
-        self,
-        page_index: more_than_zero(int)=1,
-        page_size: non_negative(int)=20,
-        user_address: non_blank(str)="",
-        export_file_name: str="",
-    ):
-        """Fetches Nft data from the API. 
-        https://developer.nftscan.com/doc/#operation/getUserRecordByUserAddressUsingPOST
+        Args:
+            method_name (str): name of a paginated endpoint method, eg.
+            "getAllNftByUserAddress"
+            page_size (int, optional): records per page
+            max_workers (int, optional): maximum number of pages fetched at
+            the same time
+            **kwargs: remaining arguments for the endpoint method
+
+        Yields:
+            dict: records from the `content` of each page
+        """
+        # The endpoints never send more than MAX_PAGE_SIZE records per page
+        page_size = min(page_size, self.MAX_PAGE_SIZE)
+        more_than_zero(page_size, "page_size")
+        method = getattr(self, method_name)
+        first = method(page_index=1, page_size=page_size, **kwargs)
+        yield from _page_content(first)
+        page_count = math.ceil(_page_total(first) / page_size)
+        if page_count < 2:
+            return
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [
+                executor.submit(
+                    method, page_index=page_index, page_size=page_size, **kwargs)
+                for page_index in range(2, page_count + 1)
+            ]
+            for future in as_completed(futures):
+                yield from _page_content(future.result())
+        finally:
+            # The consumer may stop early, or a page may fail: drop the pages
+            # not fetched yet rather than requesting them for nothing
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_user_overview(self, user_address, erc="erc721"):
+        """Fetches the NFTs, NFTs grouped by contract and transaction records
+        of a user, requesting the three endpoints in parallel.
 
         Args:
             user_address (str): User address
-            export_file_name (str, optional): Exports the JSON data into a the
-            specified file.
+            erc (str, optional): erc protocol (erc721 or erc1155)
 
         Returns:
-            [dict]: All Nfts for given protocol and users
+            [dict]: the results of `getAllNftByUserAddress`,
+            `getGroupByNftContract` and `getUserRecordByUserAddress`
         """
-        endpoint = f"getUserRecordByUserAddress"
-        data = {
-            "page_index": page_index,
-            "page_size": page_size,
-            "user_address":user_address
-        }
-        return self._api_request(endpoint, data, export_file_name)
\ No newline at end of file
+        # Authenticate once, rather than in each of the threads
+        self._ensure_token()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(
+                    self.getAllNftByUserAddress, erc=erc, user_address=user_address),
+                executor.submit(
+                    self.getGroupByNftContract, erc=erc, user_address=user_address),
+                executor.submit(
+                    self.getUserRecordByUserAddress, user_address=user_address),
+            ]
+            return [future.result() for future in futures]
+
+
+# Endpoint methods
+#
+# Every endpoint takes a handful of arguments, validates them and posts them
+# as is, so rather than writing the same method a dozen times, the methods
+# are generated from the specs below (much like `collections.namedtuple`),
+# with explicit signatures, inlined validation and docstrings.
+
+_REQUIRED = object()
+
+# Arguments shared by the endpoints:
+# name: (default, annotation, validation, description)
+_ARGUMENTS = {
+    "erc": (_REQUIRED, "str", "erc_valid(erc)",
+            "erc protocol (erc721 or erc1155)"),
+    "nft_address": ("", "str", 'non_blank(nft_address, "nft_address")',
+                    "NFT contract address"),
+    "page_index": (1, "int", 'more_than_zero(page_index, "page_index")',
+                   "Page to fetch, starting at 1"),
+    "page_size": (20, "int", 'non_negative(page_size, "page_size")',
+                  "Records per page, at most `MAX_PAGE_SIZE`"),
+    "token_id": ("", "str", 'non_blank(token_id, "token_id")',
+                 "Token id"),
+    "user_address": ("", "str", 'non_blank(user_address, "user_address")',
+                     "User address"),
+}
+
+# `user_address` has no default for the endpoints listing a user's NFTs
+_REQUIRED_USER_ADDRESS = (
+    "user_address", _REQUIRED, "str", 'non_blank(user_address, "user_address")',
+    "User address")
+
+# name: (arguments, cached); arguments are either names from `_ARGUMENTS`,
+# or (name, default, annotation, validation, description) tuples.
+# Cached endpoints are slowly changing lookups, see `cache_ttl`.
+_ENDPOINTS = {
+    "getAllNftByUserAddress": (
+        ("erc", _REQUIRED_USER_ADDRESS, "page_index", "page_size"), False),
+    "getGroupByNftContract": (
+        ("erc", _REQUIRED_USER_ADDRESS), True),
+    "getMintByUserAddress": (
+        ("page_index", "page_size", "user_address"), False),
+    "getMintByUserAddressAndNftAddress": (
+        ("nft_address", "page_index", "page_size", "user_address"), False),
+    "getNFTRecordByContract": (
+        ("nft_address", "page_index", "page_size"), False),
+    "getNftByContractAndUserAddress": (
+        ("nft_address", "page_index", "page_size", "user_address"), False),
+    "getRecordByUserAddressAndTokenId": (
+        ("nft_address", "page_index", "page_size", "token_id", "user_address"), False),
+    "getSingleNft": (
+        ("nft_address", "token_id"), True),
+    "getSingleNftRecord": (
+        ("nft_address", "page_index", "page_size", "token_id"), False),
+    "getStates": (
+        (("nft_address", _REQUIRED, "list", None,
+          "array of NFT contract addresses"),), True),
+    "getUserRecordByContract": (
+        ("nft_address", "page_index", "page_size", "user_address"), False),
+    "getUserRecordByUserAddress": (
+        ("page_index", "page_size", "user_address"), False),
+}
+
+_METHOD_TEMPLATE = """\
+def {name}(self, {parameters}):
+{checks}    data = {{{fields}}}
+    return self._api_request("{name}", data, export_file_name{options})
+"""
+
+_DOCSTRING_TEMPLATE = """Fetches Nft data from the API.
+https://developer.nftscan.com/doc/#operation/{name}UsingPOST
+
+Args:
+{arguments}
+Returns:
+    [dict]: Data sent back from the API{streamed}.
+"""
+
+def _endpoint_method(name, arguments, cached):
+    """Generates the method calling an endpoint.
+
+    Args:
+        name (str): endpoint name
+        arguments (tuple): endpoint arguments, see `_ENDPOINTS`
+        cached (bool): whether results of the endpoint are cached
+
+    Returns:
+        function
+    """
+    arguments = [
+        (argument, *_ARGUMENTS[argument]) if isinstance(argument, str) else argument
+        for argument in arguments]
+    paginated = any(argument[0] == "page_index" for argument in arguments)
+    parameters, checks, fields, docs = [], [], [], []
+    for argument, default, annotation, validation, description in arguments:
+        if default is _REQUIRED:
+            parameters.append(f"{argument}: {annotation}")
+        else:
+            parameters.append(f"{argument}: {annotation}={default!r}")
+            annotation += ", optional"
+        if validation:
+            checks.append(f"    {validation}\n")
+        value = argument
+        if argument == "page_size":
+            value = "min(page_size, self.MAX_PAGE_SIZE)"
+        fields.append(f"{argument!r}: {value}")
+        docs.append(f"    {argument} ({annotation}): {description}\n")
+    parameters.append('export_file_name: str=""')
+    docs.append(
+        "    export_file_name (str, optional): Exports the JSON data into the\n"
+        "    specified file.\n")
+    options = ""
+    if paginated:
+        parameters.append("stream: bool=False")
+        options += ", stream=stream"
+        docs.append(
+            "    stream (bool, optional): Lazily yields the records of the page\n"
+            "    while they're being downloaded, instead of returning the\n"
+            "    whole response.\n")
+    if cached:
+        options += ", cache=True"
+
+    source = _METHOD_TEMPLATE.format(
+        name=name,
+        parameters=", ".join(parameters),
+        checks="".join(checks),
+        fields=", ".join(fields),
+        options=options)
+    namespace = {
+        "erc_valid": erc_valid,
+        "more_than_zero": more_than_zero,
+        "non_blank": non_blank,
+        "non_negative": non_negative,
+    }
+    exec(compile(source, f"<NftScanAPI.{name}>", "exec"), namespace)
+    method = namespace[name]
+    method.__qualname__ = f"NftScanAPI.{name}"
+    method.__module__ = __name__
+    method.__doc__ = _DOCSTRING_TEMPLATE.format(
+        name=name,
+        arguments="".join(docs),
+        streamed=", or a generator of its records when streaming" if paginated else "")
+    return method
+
+def _create_decoders(record_types):
+    """Builds the decoder of the typed responses of every endpoint.
+
+    Args:
+        record_types (dict): endpoint name to record type, see `NftScanAPI`
+
+    Returns:
+        dict: endpoint name to `msgspec.json.Decoder`
+    """
+    try:
+        from . import models
+    except ImportError as e:
+        raise ImportError(
+            "Typed responses require msgspec: pip install nftscan-api[typed]") from e
+    decoders = {}
+    for name, (arguments, cached) in _ENDPOINTS.items():
+        paginated = "page_index" in arguments
+        if name in record_types:
+            decoders[name] = models.envelope_decoder(paginated, record_types[name])
+        else:
+            decoders[name] = models.envelope_decoder(paginated)
+    return decoders
+
+for _name, _spec in _ENDPOINTS.items():
+    setattr(NftScanAPI, _name, _endpoint_method(_name, *_spec))
@@ -0,0 +1,355 @@
+import asyncio
+import math
+from . import utils
+from .nftscan_api import AuthenticationError, NftScanAPI, _encode_json, _page_content, _page_total, \
+    _raise_for_status_code, more_than_zero
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+
+class _AsyncByteReader:
+    """File-like view of a response body being downloaded, as expected by
+    `ijson.parse_async`."""
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def read(self, size=-1):
+        # ijson first reads 0 bytes to tell whether the file is binary
+        if size == 0:
+            return b""
+        async for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b""
+
+
+async def _aiter_records(file):
+    """Async version of the records decoding done by
+    `NftScanAPI._stream_request`: yields the records listed in the
+    `data.content` array of a JSON response, failing as soon as the status
+    code embedded in it turns out not to be a success."""
+    builder, depth = None, 0
+    async for prefix, event, value in ijson.parse_async(file):
+        if prefix == "code":
+            _raise_for_status_code(value, f"Request failed with code {value}")
+        if builder is None:
+            if prefix != "data.content.item":
+                continue
+            if event not in ("start_map", "start_array"):
+                yield value
+                continue
+            builder = ijson.ObjectBuilder()
+        builder.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            yield builder.value
+            builder = None
+
+
+class AsyncNftScanAPI(NftScanAPI):
+    """Asyncio flavour of `NftScanAPI`.
+
+    Exposes the same endpoint methods, but each of them returns a coroutine,
+    so many requests can be awaited concurrently (eg. with `asyncio.gather`)
+    over a single pooled client:
+
+        async with AsyncNftScanAPI(apiKey=key, apiSecret=secret) as nftScan:
+            nfts, groups = await asyncio.gather(
+                nftScan.getAllNftByUserAddress(erc="erc721", user_address=wallet),
+                nftScan.getGroupByNftContract(erc="erc721", user_address=wallet))
+
+    Requires the `async` extra: `pip install nftscan-api[async]`
+    """
+    __slots__ = ()
+    # Upper bound on requests in flight at once
+    MAX_CONCURRENCY = 64
+
+    def _create_session(self):
+        """Creates the pooled, keep-alive HTTP client shared by every
+        request made through this instance.
+
+        Every endpoint lives on the same host, so the client speaks HTTP/2
+        and multiplexes concurrent requests over a single connection
+        instead of opening one socket per in-flight request.
+
+        Returns:
+            httpx.AsyncClient
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncNftScanAPI requires httpx: pip install nftscan-api[async]")
+        limits = httpx.Limits(
+            max_connections=self.MAX_CONCURRENCY,
+            max_keepalive_connections=self.MAX_CONCURRENCY,
+            keepalive_expiry=60)
+        connect_timeout, read_timeout = self.TIMEOUT
+        return httpx.AsyncClient(
+            http2=True,
+            headers=self.headers,
+            limits=limits,
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True, retries=3, limits=limits))
+
+    async def close(self):
+        """Closes the underlying HTTP client and its pooled connections."""
+        await self._session.aclose()
+
+    def __enter__(self):
+        raise TypeError(
+            "AsyncNftScanAPI must be used with `async with`, not `with`")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _authenticate(self):
+        """Async version of `NftScanAPI._authenticate`."""
+        result = await self._make_request(
+            self._auth_url, params=self._auth_params(), method="GET")
+        self._store_token(result)
+
+    def _create_auth_lock(self):
+        # Created on first use: on python 3.9 an asyncio.Lock binds to the
+        # event loop current when it is created
+        return None
+
+    def _get_auth_lock(self):
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        return self._auth_lock
+
+    async def _ensure_token(self):
+        """Async version of `NftScanAPI._ensure_token`."""
+        if self._token_expired():
+            async with self._get_auth_lock():
+                # Another task may have authenticated in the meantime
+                if self._token_expired():
+                    await self._authenticate()
+
+    async def _refresh_token(self, rejected_token):
+        """Async version of `NftScanAPI._refresh_token`."""
+        async with self._get_auth_lock():
+            if self.accessToken == rejected_token:
+                await self._authenticate()
+
+    async def _make_request(self,
+        url: str,
+        headers=None,
+        data=None,
+        export_file_name="",
+        return_response=False,
+        params=None,
+        method="POST",
+        decoder=None):
+        """Async version of `NftScanAPI._make_request`."""
+        for attempt in range(self.MAX_RETRIES + 1):
+            delay = self._rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            response = await self._session.request(
+                method,
+                url,
+                params=params,
+                content=_encode_json(data),
+                headers=headers)
+            if not self._should_retry(response, attempt):
+                break
+            await asyncio.sleep(utils.backoff_delay(response.headers, attempt))
+        return self._handle_response(
+            response, export_file_name, return_response, decoder)
+
+    async def _api_request(self,
+        endpoint: str,
+        data=None,
+        export_file_name="",
+        return_response=False,
+        stream=False,
+        cache=False):
+        """Async version of `NftScanAPI._api_request`; when streaming, the
+        awaited result is an async generator of the records."""
+        url = self._endpoint_url(endpoint)
+        result = None
+        cache_key = self._cache_key(endpoint, data, cache and not (
+            export_file_name or return_response))
+        if cache_key is not None:
+            result = self._cached_result(cache_key)
+            if result is not None:
+                return result
+        if stream:
+            if export_file_name != "" or return_response:
+                raise ValueError(
+                    "stream can't be combined with export_file_name or return_response")
+            return self._stream_request(url, data)
+        await self._ensure_token()
+        decoder = self._decoders.get(endpoint) if self._decoders else None
+        token = self.accessToken
+        try:
+            result = await self._make_request(
+                url,
+                data=data,
+                export_file_name=export_file_name,
+                return_response=return_response,
+                decoder=decoder
+            )
+        except AuthenticationError:
+            # The token was rejected (eg. revoked early): get a new one and retry
+            await self._refresh_token(token)
+            result = await self._make_request(
+                url,
+                data=data,
+                export_file_name=export_file_name,
+                return_response=return_response,
+                decoder=decoder
+            )
+
+        if cache_key is not None:
+            self._cache_result(cache_key, result)
+        return result
+
+    async def _stream_request(self, url, data=None):
+        """Async version of `NftScanAPI._stream_request`."""
+        if ijson is None:
+            raise ImportError(
+                "Streaming responses requires ijson: pip install nftscan-api[stream]")
+        await self._ensure_token()
+        for attempt in range(2):
+            token = self.accessToken
+            yielded = False
+            try:
+                response = await self._open_stream(url, data)
+                try:
+                    # aiter_bytes undoes any content encoding
+                    async for record in _aiter_records(
+                            _AsyncByteReader(response.aiter_bytes())):
+                        yielded = True
+                        yield record
+                finally:
+                    await response.aclose()
+                return
+            except AuthenticationError:
+                # Records already handed out can't be taken back: only retry
+                # when the token was rejected before the first one
+                if yielded or attempt:
+                    raise
+                await self._refresh_token(token)
+
+    async def _open_stream(self, url, data=None):
+        """Async version of `NftScanAPI._open_stream`.
+
+        Returns:
+            httpx.Response: response whose body hasn't been read yet
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            delay = self._rate_limiter.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            request = self._session.build_request("POST", url, content=_encode_json(data))
+            response = await self._session.send(request, stream=True)
+            if not self._should_retry(response, attempt):
+                break
+            await response.aclose()
+            await asyncio.sleep(utils.backoff_delay(response.headers, attempt))
+        if response.status_code >= 400:
+            # Only read the body of error responses, the rest is streamed
+            try:
+                await response.aread()
+                _raise_for_status_code(response.status_code, response.text, response)
+            finally:
+                await response.aclose()
+        return response
+
+    async def get_all_pages(self, method_name, page_size=NftScanAPI.MAX_PAGE_SIZE, **kwargs):
+        """Fetches every page of a paginated endpoint concurrently.
+
+        The first page is fetched to learn the `total` number of records, then
+        the remaining pages are requested at once (at most `MAX_CONCURRENCY`
+        in flight).
+
+        Args:
+            method_name (str): name of a paginated endpoint method, eg.
+            "getAllNftByUserAddress"
+            page_size (int, optional): records per page
+            **kwargs: remaining arguments for the endpoint method
+
+        Returns:
+            [dict]: the `content` of every page, in page order
+        """
+        first, fetches = await self._fetch_pages(method_name, page_size, kwargs)
+        content = list(_page_content(first))
+        for page in await asyncio.gather(*fetches):
+            content.extend(_page_content(page))
+        return content
+
+    async def iter_all_pages(self, method_name, page_size=NftScanAPI.MAX_PAGE_SIZE, **kwargs):
+        """Async version of `NftScanAPI.iter_all_pages`; records are
+        yielded as soon as their page arrives.
+
+        Args:
+            method_name (str): name of a paginated endpoint method, eg.
+            "getAllNftByUserAddress"
+            page_size (int, optional): records per page
+            **kwargs: remaining arguments for the endpoint method
+
+        Yields:
+            dict: records from the `content` of each page
+        """
+        first, fetches = await self._fetch_pages(method_name, page_size, kwargs)
+        tasks = [asyncio.ensure_future(fetch) for fetch in fetches]
+        try:
+            for record in _page_content(first):
+                yield record
+            for task in asyncio.as_completed(tasks):
+                for record in _page_content(await task):
+                    yield record
+        finally:
+            # The consumer may stop early: don't leave the fetches running
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_user_overview(self, user_address, erc="erc721"):
+        """Async version of `NftScanAPI.fetch_user_overview`."""
+        await self._ensure_token()
+        return list(await asyncio.gather(
+            self.getAllNftByUserAddress(erc=erc, user_address=user_address),
+            self.getGroupByNftContract(erc=erc, user_address=user_address),
+            self.getUserRecordByUserAddress(user_address=user_address)))
+
+    async def _fetch_pages(self, method_name, page_size, kwargs):
+        """Fetches the first page of an endpoint, and prepares the
+        (not yet awaited) fetches of the remaining ones.
+
+        Returns:
+            (dict, [coroutine]): the first page and the remaining fetches
+        """
+        # The endpoints never send more than MAX_PAGE_SIZE records per page
+        page_size = min(page_size, self.MAX_PAGE_SIZE)
+        more_than_zero(page_size, "page_size")
+        method = getattr(self, method_name)
+        first = await method(page_index=1, page_size=page_size, **kwargs)
+        page_count = math.ceil(_page_total(first) / page_size)
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+
+        async def fetch(page_index):
+            async with semaphore:
+                return await method(
+                    page_index=page_index, page_size=page_size, **kwargs)
+
+        return first, [fetch(page_index) for page_index in range(2, page_count + 1)]
+
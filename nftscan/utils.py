@@ -1,18 +1,39 @@
+from collections import OrderedDict
 from datetime import datetime, timezone
 import json
+import orjson
+import os
+import random
+import threading
+import time
+import warnings
 
 
-def force_encoded_json(content: str):
+def force_encoded_json(content):
     """Guarantees that content is a json, encoded string
 
+    Deprecated: the client no longer uses it, exports are written as
+    received from the API.
+
     Args:
-        content (str or bytes): Content to forced into json formatting. 
+        content (str, bytes or any json serializable object): Content to
+        forced into json formatting.
+
+    Returns:
+        str or bytes: `content` itself when it already is json, otherwise
+        its (compact, utf-8) json encoding as bytes
     """
+    warnings.warn(
+        "force_encoded_json is deprecated and will be removed",
+        DeprecationWarning, stacklevel=2)
+    if not isinstance(content, (str, bytes)):
+        # Objects can be serialized right away, no need to try parsing them
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
     try:
-        json.loads(content)
-    except (TypeError, ValueError) as e:
+        orjson.loads(content)
+    except orjson.JSONDecodeError:
         # Try forcing the issue
-        return json.dumps(content).encode()
+        return orjson.dumps(content if isinstance(content, str) else content.decode())
     return content
 
 
@@ -28,6 +49,187 @@ def export_file(content, file_name):
         f.write(content)
 
 
+def export_private_json(content, file_name):
+    """Writes `content` as json into a file only readable by the current
+    user, creating its parent directories if needed. If the file already
+    exists, overwrites it.
+
+    Args:
+        content (dict): Data to be serialized into the file.
+        file_name (str): Path of the file, `~` is expanded.
+    """
+    file_name = os.path.expanduser(file_name)
+    os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+    fd = os.open(file_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(content, f)
+
+
+def import_json(file_name):
+    """Reads a json file, if it exists and is valid json.
+
+    Args:
+        file_name (str): Path of the file, `~` is expanded.
+
+    Returns:
+        The deserialized content, or None.
+    """
+    try:
+        with open(os.path.expanduser(file_name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class TTLCache:
+    """Thread safe cache whose entries expire `ttl` seconds after being
+    stored. Once it holds `maxsize` entries, the oldest ones are evicted.
+
+    Args:
+        maxsize (int): Maximum number of entries.
+        ttl (float): Lifetime of the entries, in seconds.
+    """
+
+    __slots__ = ("maxsize", "ttl", "_entries", "_lock")
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Returns the value stored for `key`, or `default` if there is none
+        or it has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        """Stores `value` for `key`, evicting the oldest entries if needed."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Removes every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class TokenBucket:
+    """Thread safe token bucket rate limiter.
+
+    Callers `reserve()` a token before each request and wait for the
+    returned delay. The bucket can also be paused according to the rate
+    limit state reported by the server (see `update()`).
+
+    Args:
+        rate (float): Tokens added per second, None (or 0) for no limit.
+        burst (int): Maximum number of tokens the bucket holds.
+    """
+
+    __slots__ = (
+        "rate", "burst", "_tokens", "_updated", "_paused_until", "_lock")
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate or None
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token.
+
+        Returns:
+            float: seconds to wait before the token can be used.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, 0.0)
+            if self.rate is None:
+                return wait
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def update(self, remaining=None, reset=None):
+        """Adjusts the bucket to the rate limit state reported by the server.
+
+        Args:
+            remaining (int, optional): Requests left in the current window.
+            reset (float, optional): Seconds until the window resets.
+        """
+        with self._lock:
+            if remaining is not None and self.rate is not None:
+                self._tokens = min(self._tokens, remaining)
+            if remaining == 0 and reset is not None:
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + reset)
+
+
+def rate_limit_from_headers(headers):
+    """Extracts the rate limit state from `X-RateLimit-*` response headers.
+
+    Args:
+        headers (dict-like): Response headers.
+
+    Returns:
+        (int, float): Requests remaining and seconds until the limit resets,
+        either of them None when not reported.
+    """
+    remaining = reset = None
+    try:
+        remaining = int(headers["X-RateLimit-Remaining"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        reset = float(headers["X-RateLimit-Reset"])
+        # Some servers send a unix timestamp rather than a delay
+        if reset > 1e9:
+            reset -= time.time()
+        reset = max(reset, 0.0)
+    except (KeyError, ValueError):
+        pass
+    return remaining, reset
+
+
+# Upper bound, in seconds, on the wait before retrying a request
+MAX_BACKOFF = 30
+
+
+def backoff_delay(headers, attempt):
+    """Seconds to wait before retrying a rate limited request: the server's
+    `Retry-After` when it sends one, otherwise an exponential back-off with
+    jitter. Never more than `MAX_BACKOFF` seconds.
+
+    Args:
+        headers (dict-like): Headers of the rate limited response.
+        attempt (int): Number of attempts made so far, starting at 0.
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0), MAX_BACKOFF)
+        except ValueError:
+            pass
+    return min(2 ** attempt * 0.3, MAX_BACKOFF) + random.uniform(0, 0.3)
+
+
 def str_to_datetime_utc(str):
     """Converts a string into UTC datetime object.
 
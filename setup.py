@@ -10,7 +10,13 @@ with open('README.md') as readme_file:
 with open('HISTORY.md') as history_file:
     history = history_file.read()
 
-requirements = ['requests>=2.27.1']
+requirements = ['requests>=2.27.1', 'urllib3>=1.26', 'orjson>=3.6', 'brotli>=1.0']
+
+extra_requirements = {
+    'async': ['httpx[http2]>=0.23'],
+    'stream': ['ijson>=3.1'],
+    'typed': ['msgspec>=0.16'],
+}
 
 test_requirements = ['pytest>=3', ]
 
@@ -34,6 +40,7 @@ setup(
     ],
     description="Python 3 wrapper for the NFTScan API",
     install_requires=requirements,
+    extras_require=extra_requirements,
     license="MIT license",
     long_description=readme + "\n\n" + history,
     long_description_content_type="text/markdown",
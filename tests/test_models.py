@@ -0,0 +1,51 @@
+import pytest
+
+msgspec = pytest.importorskip("msgspec")
+
+from nftscan.models import Envelope, Page, envelope_decoder  # noqa: E402
+
+
+class Nft(msgspec.Struct):
+    contract_address: str
+    token_id: str
+    amount: int = 1
+
+
+PAGE = b"""{"code": 200, "msg": null, "data": {"total": 2, "content": [
+    {"contract_address": "0x1", "token_id": "1", "unknown": true},
+    {"contract_address": "0x1", "token_id": "2", "amount": 3}]}}"""
+
+
+def test_paginated_records_default_to_dicts():
+    envelope = envelope_decoder(paginated=True).decode(PAGE)
+    assert isinstance(envelope, Envelope)
+    assert envelope.code == 200
+    assert isinstance(envelope.data, Page)
+    assert envelope.data.total == 2
+    assert envelope.data.content[1] == {
+        "contract_address": "0x1", "token_id": "2", "amount": 3}
+
+
+def test_paginated_records_typed():
+    envelope = envelope_decoder(paginated=True, record_type=Nft).decode(PAGE)
+    assert envelope.data.content == [
+        Nft(contract_address="0x1", token_id="1"),
+        Nft(contract_address="0x1", token_id="2", amount=3)]
+
+
+def test_data_typed():
+    body = b'{"code": 200, "data": {"contract_address": "0x1", "token_id": "1"}}'
+    envelope = envelope_decoder(paginated=False, record_type=Nft).decode(body)
+    assert envelope.data == Nft(contract_address="0x1", token_id="1")
+    assert envelope.msg is None
+
+
+def test_empty_page():
+    envelope = envelope_decoder(paginated=True).decode(b'{"code": 200, "data": {}}')
+    assert envelope.data == Page(total=0, content=[])
+
+
+def test_invalid_records():
+    body = b'{"code": 200, "data": {"total": 1, "content": [{"token_id": 1}]}}'
+    with pytest.raises(msgspec.ValidationError):
+        envelope_decoder(paginated=True, record_type=Nft).decode(body)
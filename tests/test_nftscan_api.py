@@ -0,0 +1,704 @@
+import asyncio
+import inspect
+import io
+import threading
+import time
+from unittest import mock
+
+import orjson
+import pytest
+import requests
+
+from nftscan import AuthenticationError, NftScanAPI
+from nftscan.nftscan_api import _page_content
+
+BASE_URL = "https://nftscan.test/api/"
+WALLET = "0x0000000000000000000000000000000000000001"
+
+
+class FakeResponse:
+    """Bare bones stand-in for a `requests`/`httpx` response."""
+
+    def __init__(self, body, status_code=200, headers=None):
+        self.content = orjson.dumps(body)
+        self.text = self.content.decode()
+        self.status_code = status_code
+        self.headers = {"Content-Encoding": "br", **(headers or {})}
+        self.url = "https://nftscan.test/"
+
+
+class FakeStreamResponse(FakeResponse):
+    """Streamed response, whose body is read from `raw` (sync client) or
+    `aiter_bytes()` (async client) in small chunks."""
+
+    def __init__(self, body, status_code=200, headers=None):
+        super().__init__(body, status_code, headers)
+        self.raw = io.BytesIO(self.content)
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.closed = True
+
+    async def aiter_bytes(self):
+        for start in range(0, len(self.content), 8):
+            yield self.content[start:start + 8]
+
+    async def aread(self):
+        return self.content
+
+    async def aclose(self):
+        self.closed = True
+
+
+def token_response(token, expiration=3600):
+    return FakeResponse(
+        {"code": 200, "data": {"accessToken": token, "expiration": expiration}})
+
+
+def data_response(data, code=200, status_code=200):
+    return FakeResponse({"code": code, "msg": None, "data": data}, status_code)
+
+
+def mock_session(responses):
+    """Session handing out `responses` in order, recording the access token
+    each request is made with."""
+    session = mock.Mock()
+    session.headers = {}
+    tokens = []
+
+    def request(*args, **kwargs):
+        tokens.append(session.headers.get("Access-Token"))
+        return responses.pop(0)
+
+    session.request.side_effect = request
+    session.tokens = tokens
+    return session
+
+
+def stream_session(responses):
+    """Session like `mock_session`'s, where streamed requests (POSTs made by
+    the sync client, `send`s by the async one) get the FakeStreamResponses
+    in `responses`."""
+    session = mock_session([
+        response for response in responses
+        if not isinstance(response, FakeStreamResponse)])
+    streamed = [
+        response for response in responses if isinstance(response, FakeStreamResponse)]
+
+    def stream(*args, **kwargs):
+        session.tokens.append(session.headers.get("Access-Token"))
+        return streamed.pop(0)
+
+    session.post.side_effect = stream
+    session.send = mock.AsyncMock(side_effect=stream)
+    return session
+
+
+def paged_session(total, delay=0.0):
+    """Session serving the pages of a paginated endpoint listing `total`
+    records, whatever order they're requested in."""
+    session = mock.Mock()
+    session.headers = {}
+    lock = threading.Lock()
+    session.pages = []
+
+    def request(method, url, **kwargs):
+        if method == "GET":
+            return token_response("token")
+        time.sleep(delay)
+        # requests sends `data`, httpx `content`
+        body = orjson.loads(kwargs.get("data") or kwargs["content"])
+        with lock:
+            session.pages.append(body["page_index"])
+        start = (body["page_index"] - 1) * body["page_size"]
+        end = min(start + body["page_size"], total)
+        return data_response(
+            {"total": total, "content": [{"i": i} for i in range(start, end)]})
+
+    session.request.side_effect = request
+    return session
+
+
+def run_async(session, use):
+    """Runs `use(api)` with an AsyncNftScanAPI whose HTTP client is the mocked
+    `session`."""
+    pytest.importorskip("httpx")
+    from nftscan import AsyncNftScanAPI
+
+    async def main():
+        async with AsyncNftScanAPI(
+                apiKey="key", apiSecret="secret", base_url=BASE_URL) as api:
+            await api._session.aclose()
+            session.request = mock.AsyncMock(side_effect=session.request.side_effect)
+            session.aclose = mock.AsyncMock()
+            api._session = session
+            return await use(api)
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def api():
+    return NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL)
+
+
+def sent_body(session, call=-1):
+    return orjson.loads(session.request.call_args_list[call].kwargs["data"])
+
+
+def test_required_arguments_have_no_default():
+    signature = inspect.signature(NftScanAPI.getAllNftByUserAddress)
+    assert list(signature.parameters) == [
+        "self", "erc", "user_address", "page_index", "page_size",
+        "export_file_name", "stream"]
+    assert signature.parameters["erc"].default is inspect.Parameter.empty
+    assert signature.parameters["user_address"].default is inspect.Parameter.empty
+    assert signature.parameters["page_index"].default == 1
+    assert signature.parameters["page_size"].default == 20
+
+    signature = inspect.signature(NftScanAPI.getGroupByNftContract)
+    assert list(signature.parameters) == [
+        "self", "erc", "user_address", "export_file_name"]
+    assert signature.parameters["user_address"].default is inspect.Parameter.empty
+
+
+def test_optional_arguments_keep_their_defaults():
+    signature = inspect.signature(NftScanAPI.getUserRecordByUserAddress)
+    assert signature.parameters["user_address"].default == ""
+    assert "stream" in signature.parameters
+    assert "stream" not in inspect.signature(NftScanAPI.getSingleNft).parameters
+
+
+def test_generated_methods_are_documented():
+    assert NftScanAPI.getSingleNft.__qualname__ == "NftScanAPI.getSingleNft"
+    assert "token_id (str, optional): Token id" in NftScanAPI.getSingleNft.__doc__
+    assert "erc (str): erc protocol" in NftScanAPI.getGroupByNftContract.__doc__
+
+
+def test_missing_required_argument(api):
+    with pytest.raises(TypeError):
+        api.getGroupByNftContract(erc="erc721")
+
+
+@pytest.mark.parametrize("kwargs, message", [
+    ({"erc": "erc20", "user_address": WALLET}, "erc must be one of"),
+    ({"erc": "erc721", "user_address": " "}, "`user_address` cannot be blank"),
+    ({"erc": "erc721", "user_address": WALLET, "page_index": 0},
+     "`page_index` must be 1 or higher"),
+    ({"erc": "erc721", "user_address": WALLET, "page_size": -1},
+     "`page_size` must be 0 or higher"),
+])
+def test_invalid_arguments(api, kwargs, message):
+    api._session = mock_session([])
+    with pytest.raises(ValueError, match=message):
+        api.getAllNftByUserAddress(**kwargs)
+    api._session.request.assert_not_called()
+
+
+def test_request_body(api):
+    api._session = session = mock_session([
+        token_response("token"),
+        data_response({"total": 0, "content": []}),
+    ])
+    result = api.getAllNftByUserAddress(
+        erc="erc1155", user_address=WALLET, page_index=2, page_size=1000)
+    assert result == {"total": 0, "content": []}
+    method, url = session.request.call_args.args
+    assert (method, url) == (
+        "POST", "https://nftscan.test/api/v1/getAllNftByUserAddress")
+    # page_size is capped at MAX_PAGE_SIZE
+    assert sent_body(session) == {
+        "erc": "erc1155", "user_address": WALLET,
+        "page_index": 2, "page_size": NftScanAPI.MAX_PAGE_SIZE}
+
+
+def test_authenticates_once(api):
+    api._session = session = mock_session([
+        token_response("token"),
+        data_response({"total": 0, "content": []}),
+        data_response({"total": 0, "content": []}),
+    ])
+    api.getMintByUserAddress(user_address=WALLET)
+    api.getMintByUserAddress(user_address=WALLET, page_index=2)
+    method, url = session.request.call_args_list[0].args
+    assert (method, url) == ("GET", "https://nftscan.test/gw/token")
+    assert session.request.call_args_list[0].kwargs["params"] == {
+        "apiKey": "key", "apiSecret": "secret"}
+    assert session.tokens == [None, "token", "token"]
+
+
+@pytest.mark.parametrize("rejection", [
+    # Either as the HTTP status, or as the code embedded in the JSON body
+    data_response(None, code=401, status_code=401),
+    data_response(None, code=401),
+    FakeResponse({"code": 401, "msg": "bad token"}),
+])
+@pytest.mark.parametrize("typed", [False, True])
+def test_reauthenticates_when_token_is_rejected(rejection, typed):
+    if typed:
+        pytest.importorskip("msgspec")
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL, typed=typed)
+    api._session = session = mock_session([
+        token_response("revoked"),
+        rejection,
+        token_response("fresh"),
+        data_response({"total": 0, "content": []}),
+    ])
+    page = api.getMintByUserAddress(user_address=WALLET)
+    assert _page_content(page) == []
+    assert session.tokens == [None, "revoked", "revoked", "fresh"]
+    assert api.accessToken == "fresh"
+
+
+def test_gives_up_when_new_token_is_rejected_too(api):
+    api._session = mock_session([
+        token_response("revoked"),
+        data_response(None, code=401, status_code=401),
+        token_response("fresh"),
+        data_response(None, code=401, status_code=401),
+    ])
+    with pytest.raises(AuthenticationError):
+        api.getMintByUserAddress(user_address=WALLET)
+
+
+def test_reauthenticates_expired_token(api):
+    api._session = session = mock_session([
+        # Expires within TOKEN_REFRESH_MARGIN, so it's replaced by the next call
+        token_response("expiring", expiration=1),
+        data_response({"total": 0, "content": []}),
+        token_response("fresh"),
+        data_response({"total": 0, "content": []}),
+    ])
+    api.getMintByUserAddress(user_address=WALLET)
+    api.getMintByUserAddress(user_address=WALLET)
+    assert session.tokens == [None, "expiring", "expiring", "fresh"]
+
+
+def test_async_reauthenticates_when_token_is_rejected():
+    session = mock_session([
+        token_response("revoked"),
+        data_response(None, code=401, status_code=401),
+        token_response("fresh"),
+        data_response({"total": 0, "content": []}),
+    ])
+    result = run_async(
+        session, lambda api: api.getMintByUserAddress(user_address=WALLET))
+    assert result == {"total": 0, "content": []}
+    assert session.tokens == [None, "revoked", "revoked", "fresh"]
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_cache_hits_get_their_own_copy(typed):
+    if typed:
+        pytest.importorskip("msgspec")
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL, typed=typed)
+    api._session = session = mock_session([
+        token_response("token"),
+        data_response({"name": "nft", "attributes": []}),
+    ])
+    first = api.getSingleNft(nft_address="0x1", token_id="1")
+    first["attributes"].append("changed")
+    second = api.getSingleNft(nft_address="0x1", token_id="1")
+    second["attributes"].append("changed again")
+    third = api.getSingleNft(nft_address="0x1", token_id="1")
+    assert third == {"name": "nft", "attributes": []}
+    assert session.request.call_count == 2
+
+
+def test_typed_cache_hits_get_their_own_copy():
+    msgspec = pytest.importorskip("msgspec")
+
+    class Nft(msgspec.Struct):
+        name: str
+        attributes: list
+
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL,
+                     record_types={"getSingleNft": Nft})
+    api._session = mock_session([
+        token_response("token"),
+        data_response({"name": "nft", "attributes": []}),
+    ])
+    first = api.getSingleNft(nft_address="0x1", token_id="1")
+    first.attributes.append(1)
+    second = api.getSingleNft(nft_address="0x1", token_id="1")
+    assert second == Nft(name="nft", attributes=[])
+    assert second is not first
+
+
+def test_zero_rate_limit_disables_limiting():
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL, rate_limit=0)
+    api._session = mock_session([
+        token_response("token"),
+        data_response({"total": 0, "content": []}),
+        data_response({"total": 0, "content": []}),
+    ])
+    api.getMintByUserAddress(user_address=WALLET)
+    api.getMintByUserAddress(user_address=WALLET)
+
+
+def test_negative_rate_limit():
+    with pytest.raises(ValueError, match="`rate_limit` cannot be negative"):
+        NftScanAPI(apiKey="key", apiSecret="secret", rate_limit=-1)
+
+
+def test_missing_data():
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL)
+    api._session = mock_session([token_response("token"), FakeResponse({"code": 200})])
+    with pytest.raises(Exception, match="no data in JSON response"):
+        api.getMintByUserAddress(user_address=WALLET)
+
+
+def test_rate_limited_requests_are_retried(api, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("nftscan.nftscan_api.time.sleep", sleeps.append)
+    api._session = mock_session([
+        token_response("token"),
+        FakeResponse({}, status_code=429, headers={"Retry-After": "2"}),
+        data_response({"total": 0, "content": []}),
+    ])
+    assert api.getMintByUserAddress(user_address=WALLET) == {"total": 0, "content": []}
+    assert sleeps == [2.0]
+
+
+def test_iter_all_pages(api):
+    api._session = session = paged_session(total=250)
+    records = list(api.iter_all_pages(
+        "getMintByUserAddress", page_size=1000, user_address=WALLET))
+    # page_size is capped at MAX_PAGE_SIZE, so 3 pages are needed
+    assert sorted(record["i"] for record in records) == list(range(250))
+    assert sorted(session.pages) == [1, 2, 3]
+
+
+def test_iter_all_pages_single_page(api):
+    api._session = session = paged_session(total=5)
+    records = list(api.iter_all_pages("getMintByUserAddress", user_address=WALLET))
+    assert [record["i"] for record in records] == list(range(5))
+    assert session.pages == [1]
+
+
+def test_iter_all_pages_rejects_empty_pages(api):
+    with pytest.raises(ValueError, match="`page_size` must be 1 or higher"):
+        next(api.iter_all_pages("getMintByUserAddress", page_size=0, user_address=WALLET))
+
+
+def test_iter_all_pages_stopped_early(api):
+    api._session = session = paged_session(total=20, delay=0.02)
+    records = api.iter_all_pages(
+        "getMintByUserAddress", page_size=1, max_workers=2, user_address=WALLET)
+    next(records)  # from the first page
+    next(records)  # from whichever page is fetched first next
+    records.close()
+    time.sleep(0.1)
+    # Only the pages already being fetched are completed, not all 20
+    assert len(session.pages) <= 6
+
+
+def test_iter_all_pages_cancels_pages_after_error(api):
+    session = paged_session(total=20, delay=0.02)
+    request = session.request.side_effect
+
+    def failing_request(method, url, **kwargs):
+        if method == "POST" and orjson.loads(kwargs["data"])["page_index"] == 2:
+            return data_response(None, code=500, status_code=500)
+        return request(method, url, **kwargs)
+
+    session.request.side_effect = failing_request
+    api._session = session
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(api.iter_all_pages(
+            "getMintByUserAddress", page_size=1, max_workers=2, user_address=WALLET))
+    time.sleep(0.1)
+    assert len(session.pages) <= 6
+
+
+def test_async_get_all_pages():
+    session = paged_session(total=250)
+    records = run_async(session, lambda api: api.get_all_pages(
+        "getMintByUserAddress", page_size=1000, user_address=WALLET))
+    # In page order
+    assert [record["i"] for record in records] == list(range(250))
+    assert sorted(session.pages) == [1, 2, 3]
+
+
+def test_async_iter_all_pages():
+    session = paged_session(total=250)
+
+    async def use(api):
+        return [record async for record in api.iter_all_pages(
+            "getMintByUserAddress", page_size=100, user_address=WALLET)]
+
+    records = run_async(session, use)
+    assert sorted(record["i"] for record in records) == list(range(250))
+
+
+def test_async_iter_all_pages_stopped_early():
+    session = paged_session(total=20)
+
+    async def use(api):
+        records = api.iter_all_pages(
+            "getMintByUserAddress", page_size=1, user_address=WALLET)
+        await records.__anext__()
+        await records.aclose()
+        await asyncio.sleep(0)
+
+    run_async(session, use)
+    # The pending fetches were cancelled before making their request
+    assert session.pages == [1]
+
+
+def records_body(records, code=200):
+    return {"code": code, "msg": None, "data": {"total": len(records), "content": records}}
+
+
+def test_stream(api):
+    records = [{"i": i, "attributes": [{"trait": "x"}]} for i in range(5)]
+    response = FakeStreamResponse(records_body(records))
+    api._session = session = stream_session([token_response("token"), response])
+    stream = api.getMintByUserAddress(user_address=WALLET, stream=True)
+    # Nothing is requested until the records are iterated
+    session.post.assert_not_called()
+    assert list(stream) == records
+    assert session.tokens == [None, "token"]
+    assert response.closed
+    assert orjson.loads(session.post.call_args.kwargs["data"])["user_address"] == WALLET
+
+
+@pytest.mark.parametrize("rejection", [
+    FakeStreamResponse(records_body([], code=401), status_code=401),
+    FakeStreamResponse(records_body([{"i": 0}], code=401)),
+])
+def test_stream_reauthenticates_when_token_is_rejected(api, rejection):
+    records = [{"i": i} for i in range(3)]
+    api._session = session = stream_session([
+        token_response("revoked"),
+        rejection,
+        token_response("fresh"),
+        FakeStreamResponse(records_body(records)),
+    ])
+    assert list(api.getMintByUserAddress(user_address=WALLET, stream=True)) == records
+    assert session.tokens == [None, "revoked", "revoked", "fresh"]
+
+
+def test_stream_gives_up_when_new_token_is_rejected_too(api):
+    api._session = stream_session([
+        token_response("revoked"),
+        FakeStreamResponse(records_body([], code=401), status_code=401),
+        token_response("fresh"),
+        FakeStreamResponse(records_body([], code=401), status_code=401),
+    ])
+    with pytest.raises(AuthenticationError):
+        list(api.getMintByUserAddress(user_address=WALLET, stream=True))
+
+
+def test_stream_cant_export(api):
+    with pytest.raises(ValueError, match="stream can't be combined"):
+        api._api_request("getMintByUserAddress", {}, export_file_name="out.json", stream=True)
+
+
+def test_async_stream():
+    records = [{"i": i, "attributes": [{"trait": "x"}]} for i in range(5)]
+    response = FakeStreamResponse(records_body(records))
+    session = stream_session([token_response("token"), response])
+
+    async def use(api):
+        stream = await api.getMintByUserAddress(user_address=WALLET, stream=True)
+        return [record async for record in stream]
+
+    assert run_async(session, use) == records
+    assert session.tokens == [None, "token"]
+    assert response.closed
+
+
+def test_async_stream_reauthenticates_when_token_is_rejected():
+    records = [{"i": i} for i in range(3)]
+    session = stream_session([
+        token_response("revoked"),
+        FakeStreamResponse(records_body([], code=401), status_code=401),
+        token_response("fresh"),
+        FakeStreamResponse(records_body(records)),
+    ])
+
+    async def use(api):
+        stream = await api.getMintByUserAddress(user_address=WALLET, stream=True)
+        return [record async for record in stream]
+
+    assert run_async(session, use) == records
+    assert session.tokens == [None, "revoked", "revoked", "fresh"]
+
+
+def test_token_cache_file_stores_token(tmp_path):
+    token_file = tmp_path / "cache" / "token.json"
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL,
+                     token_cache_file=str(token_file))
+    api._session = mock_session([
+        token_response("token"),
+        data_response({"total": 0, "content": []}),
+    ])
+    api.getMintByUserAddress(user_address=WALLET)
+    stored = orjson.loads(token_file.read_bytes())
+    assert stored["apiKey"] == "key"
+    assert stored["accessToken"] == "token"
+    assert stored["expiration"] == pytest.approx(time.time() + 3600, abs=5)
+    # Only readable by the current user
+    assert token_file.stat().st_mode & 0o777 == 0o600
+
+
+def write_token_file(path, api_key="key", expiration=3600):
+    path.write_bytes(orjson.dumps({
+        "apiKey": api_key, "accessToken": "cached",
+        "expiration": time.time() + expiration}))
+
+
+def cached_token_client(token_file, responses):
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL,
+                     token_cache_file=str(token_file))
+    session = mock_session(responses)
+    session.headers.update(api._session.headers)
+    api._session = session
+    return api
+
+
+def test_token_cache_file_reuses_token(tmp_path):
+    token_file = tmp_path / "token.json"
+    write_token_file(token_file)
+    api = cached_token_client(token_file, [data_response({"total": 0, "content": []})])
+    api.getMintByUserAddress(user_address=WALLET)
+    assert api._session.tokens == ["cached"]
+
+
+@pytest.mark.parametrize("write", [
+    lambda path: write_token_file(path, expiration=-60),
+    # About to expire
+    lambda path: write_token_file(path, expiration=10),
+    lambda path: write_token_file(path, api_key="other key"),
+    lambda path: path.write_text("not json"),
+    lambda path: None,
+])
+def test_token_cache_file_ignored(tmp_path, write):
+    token_file = tmp_path / "token.json"
+    write(token_file)
+    api = cached_token_client(token_file, [
+        token_response("token"),
+        data_response({"total": 0, "content": []}),
+    ])
+    assert api.accessToken is None
+    api.getMintByUserAddress(user_address=WALLET)
+    assert api._session.tokens[1:] == ["token"]
+    assert orjson.loads(token_file.read_bytes())["accessToken"] == "token"
+
+
+def test_concurrent_requests_authenticate_once(api):
+    session = paged_session(total=0)
+    request = session.request.side_effect
+
+    def slow_token_request(method, url, **kwargs):
+        if method == "GET":
+            time.sleep(0.05)
+        return request(method, url, **kwargs)
+
+    session.request.side_effect = slow_token_request
+    api._session = session
+    threads = [
+        threading.Thread(target=api.getMintByUserAddress, kwargs={"user_address": WALLET})
+        for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    methods = [call.args[0] for call in session.request.call_args_list]
+    assert methods.count("GET") == 1
+    assert methods.count("POST") == 8
+
+
+def test_export_writes_raw_body(api, tmp_path):
+    export_file = tmp_path / "export.json"
+    response = data_response({"name": "nft", "price": 1.10})
+    api._session = mock_session([token_response("token"), response])
+    data = api.getSingleNft(
+        nft_address="0x1", token_id="1", export_file_name=str(export_file))
+    assert data == {"name": "nft", "price": 1.10}
+    # The envelope included, byte for byte
+    assert export_file.read_bytes() == response.content
+
+
+def test_export_bypasses_cache(api, tmp_path):
+    api._session = session = mock_session([
+        token_response("token"),
+        data_response({"name": "nft"}),
+        data_response({"name": "nft"}),
+    ])
+    for name in ("first.json", "second.json"):
+        api.getSingleNft(
+            nft_address="0x1", token_id="1", export_file_name=str(tmp_path / name))
+    assert session.request.call_count == 3
+    assert (tmp_path / "second.json").exists()
+
+
+def endpoint_session():
+    """Session answering each endpoint with its name, recording the
+    requests made."""
+    session = mock.Mock()
+    session.headers = {}
+
+    def request(method, url, **kwargs):
+        if method == "GET":
+            return token_response("token")
+        return data_response({"endpoint": url.rsplit("/", 1)[-1]})
+
+    session.request.side_effect = request
+    return session
+
+
+OVERVIEW = [
+    {"endpoint": "getAllNftByUserAddress"},
+    {"endpoint": "getGroupByNftContract"},
+    {"endpoint": "getUserRecordByUserAddress"},
+]
+
+
+def test_fetch_user_overview(api):
+    api._session = session = endpoint_session()
+    assert api.fetch_user_overview(WALLET, erc="erc1155") == OVERVIEW
+    methods = [call.args[0] for call in session.request.call_args_list]
+    assert methods == ["GET", "POST", "POST", "POST"]
+    bodies = [orjson.loads(call.kwargs["data"]) for call in session.request.call_args_list[1:]]
+    assert all(body["user_address"] == WALLET for body in bodies)
+    assert {body.get("erc") for body in bodies} == {"erc1155", None}
+
+
+def test_async_fetch_user_overview():
+    session = endpoint_session()
+    assert run_async(session, lambda api: api.fetch_user_overview(WALLET)) == OVERVIEW
+    methods = [call.args[0] for call in session.request.call_args_list]
+    assert methods == ["GET", "POST", "POST", "POST"]
+
+
+def test_typed_responses():
+    msgspec = pytest.importorskip("msgspec")
+    from nftscan.models import Page
+
+    class Record(msgspec.Struct):
+        i: int
+
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL,
+                     record_types={"getMintByUserAddress": Record})
+    api._session = paged_session(total=3)
+    page = api.getMintByUserAddress(user_address=WALLET)
+    assert page == Page(total=3, content=[Record(0), Record(1), Record(2)])
+    # Endpoints without a record type get dict records
+    page = api.getUserRecordByUserAddress(user_address=WALLET)
+    assert page == Page(total=3, content=[{"i": 0}, {"i": 1}, {"i": 2}])
+
+
+def test_typed_pages_are_iterated():
+    pytest.importorskip("msgspec")
+    api = NftScanAPI(apiKey="key", apiSecret="secret", base_url=BASE_URL, typed=True)
+    api._session = paged_session(total=250)
+    records = api.iter_all_pages("getMintByUserAddress", user_address=WALLET)
+    assert sorted(record["i"] for record in records) == list(range(250))
@@ -0,0 +1,166 @@
+import pytest
+
+from nftscan import utils
+
+
+class FakeClock:
+    """Stands in for the `time` module, so tests control the time."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(utils, "time", clock)
+    return clock
+
+
+def test_ttl_cache_returns_stored_value(clock):
+    cache = utils.TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_ttl_cache_entries_expire(clock):
+    cache = utils.TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    clock.now += 59
+    assert cache.get("key") == "value"
+    clock.now += 1
+    assert cache.get("key") is None
+
+
+def test_ttl_cache_set_renews_expiry(clock):
+    cache = utils.TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "old")
+    clock.now += 50
+    cache.set("key", "new")
+    clock.now += 50
+    assert cache.get("key") == "new"
+
+
+def test_ttl_cache_evicts_oldest_entries(clock):
+    cache = utils.TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Storing "a" again makes "b" the oldest entry
+    cache.set("a", 1)
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_clear(clock):
+    cache = utils.TTLCache(maxsize=10, ttl=60)
+    cache.set("key", "value")
+    cache.clear()
+    assert cache.get("key") is None
+
+
+def test_token_bucket_without_rate_never_waits(clock):
+    bucket = utils.TokenBucket()
+    assert [bucket.reserve() for _ in range(100)] == [0.0] * 100
+
+
+def test_token_bucket_zero_rate_never_waits(clock):
+    bucket = utils.TokenBucket(rate=0)
+    assert [bucket.reserve() for _ in range(3)] == [0.0] * 3
+
+
+def test_token_bucket_paces_requests_beyond_burst(clock):
+    bucket = utils.TokenBucket(rate=2, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = utils.TokenBucket(rate=2, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+    clock.now += 1
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_token_bucket_update_pauses_until_reset(clock):
+    bucket = utils.TokenBucket()
+    bucket.update(remaining=0, reset=10)
+    assert bucket.reserve() == pytest.approx(10)
+    clock.now += 4
+    assert bucket.reserve() == pytest.approx(6)
+    clock.now += 6
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_update_ignores_reset_while_requests_remain(clock):
+    bucket = utils.TokenBucket()
+    bucket.update(remaining=5, reset=10)
+    assert bucket.reserve() == 0.0
+
+
+def test_token_bucket_update_limits_tokens_to_remaining(clock):
+    bucket = utils.TokenBucket(rate=1, burst=5)
+    bucket.update(remaining=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_rate_limit_from_headers(clock):
+    headers = {"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "12.5"}
+    assert utils.rate_limit_from_headers(headers) == (3, 12.5)
+
+
+def test_rate_limit_from_headers_reset_timestamp(clock):
+    clock.now = 1_700_000_000.0
+    headers = {"X-RateLimit-Reset": "1700000030"}
+    assert utils.rate_limit_from_headers(headers) == (None, 30.0)
+
+
+def test_rate_limit_from_headers_missing_or_invalid(clock):
+    assert utils.rate_limit_from_headers({}) == (None, None)
+    headers = {"X-RateLimit-Remaining": "many", "X-RateLimit-Reset": "soon"}
+    assert utils.rate_limit_from_headers(headers) == (None, None)
+
+
+def test_backoff_delay_honours_retry_after():
+    assert utils.backoff_delay({"Retry-After": "2"}, attempt=0) == 2.0
+
+
+def test_backoff_delay_caps_retry_after():
+    assert utils.backoff_delay({"Retry-After": "3600"}, attempt=0) == utils.MAX_BACKOFF
+
+
+def test_backoff_delay_grows_exponentially():
+    assert 0.3 <= utils.backoff_delay({}, attempt=0) <= 0.6
+    assert 1.2 <= utils.backoff_delay({}, attempt=2) <= 1.5
+    assert utils.backoff_delay({}, attempt=20) <= utils.MAX_BACKOFF + 0.3
+
+
+@pytest.mark.parametrize("content", ['{"a": 1}', b'{"a": 1}', "[]", "3"])
+def test_force_encoded_json_keeps_json(content):
+    with pytest.deprecated_call():
+        assert utils.force_encoded_json(content) is content
+
+
+@pytest.mark.parametrize("content, expected", [
+    ({"a": "é", 1: [None]}, '{"a":"é","1":[null]}'.encode()),
+    ("not json", b'"not json"'),
+    (b"not json", b'"not json"'),
+])
+def test_force_encoded_json_encodes(content, expected):
+    with pytest.deprecated_call():
+        assert utils.force_encoded_json(content) == expected